@@ -3,19 +3,37 @@
 import argparse
 import csv
 import hashlib
-import json
+import mmap
 import sys
-from collections.abc import Iterable
+from collections import defaultdict, deque
+from collections.abc import Callable, Iterable
+from contextlib import ExitStack
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from functools import partial
-from os import scandir
+from itertools import islice
+from operator import itemgetter
+from os import SEEK_END, DirEntry, cpu_count, fstat, scandir, stat
 from pathlib import Path
 from textwrap import TextWrapper
 
 from colorama import Fore, init
-from rich.console import Console
-from rich.table import Table
-from tqdm import tqdm
-from utils.signature_checker import FileSignatureChecker
+from utils.digest_cache import DigestCache
+from utils.signature_checker import FileSignatureChecker, load_signature_index, read_header
+
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    from os import POSIX_FADV_DONTNEED, POSIX_FADV_SEQUENTIAL, posix_fadvise
+except ImportError:  # not available on Windows
+    posix_fadvise = None
 
 # Base directory path
 root = Path(__file__).resolve().parent
@@ -23,6 +41,188 @@ root = Path(__file__).resolve().parent
 # Initialize colorama
 init()
 
+# Hashes are content fingerprints only, so flag them as non-security use and
+# let OpenSSL dispatch to its fastest (SHA-NI where available) implementation.
+# New hashers are copied from a prototype, skipping context setup per file.
+new_sha256 = hashlib.new("sha256", usedforsecurity=False).copy
+
+# Bytes read from the start and end of each same-size file to pre-filter candidates
+HEAD_SIZE = 4096
+
+# Files at least this large are memory-mapped instead of read into buffers
+MMAP_THRESHOLD = 1 << 20
+
+# Files at least this large are hashed with BLAKE3's multithreaded mode
+BLAKE3_THREADS_THRESHOLD = 1 << 24
+
+# Bytes hashed from the start, middle and end of a file in --fast mode
+SAMPLE_SIZE = 65536
+
+# Header reads queued per worker during the scan
+READ_AHEAD = 4
+
+# Bytes compared per file and step when confirming XXH3 matches
+CONFIRM_BLOCK_SIZE = 1 << 20
+
+# Directories listed at once while walking the tree
+SCAN_WORKERS = min(32, (cpu_count() or 1) * 4)
+
+# Seconds between progress bar refreshes; tqdm adapts how many updates it skips
+PROGRESS_INTERVAL = 0.5
+
+# Most duplicate rows printed to the console, the CSV file always has all of them
+TABLE_ROW_LIMIT = 1000
+
+# Files sent to a worker process per task, amortising inter-process overhead
+PROCESS_CHUNKSIZE = 32
+
+
+def new_hasher(algorithm: str = "sha256") -> object:
+    """Returns a new hash object.
+
+    Args:
+        algorithm (str, optional): Hash algorithm, one of HASH_ALGORITHMS. Defaults to "sha256".
+
+    Returns:
+        object: hashlib, blake3 or xxhash hash object.
+    """
+    if algorithm == "blake3":
+        return blake3.blake3()
+    if algorithm == "xxh3":
+        return xxhash.xxh3_128()
+    return new_sha256()
+
+
+def stream_file(filepath: str, new_hash: Callable[[], object], release: bool = True) -> bytes:
+    """Returns the digest of a file, hashed with a given hash object constructor.
+
+    Args:
+        filepath (str): Path to file.
+        new_hash (Callable[[], object]): Returns a new hash object.
+        release (bool, optional): Drop the file from the page cache after hashing. Defaults to True.
+
+    Returns:
+        bytes: Digest of file.
+    """
+    # Unbuffered so file_digest reads straight into its own buffer
+    with open(filepath, "rb", buffering=0) as file_obj:
+        fileno = file_obj.fileno()
+        if posix_fadvise is not None:
+            posix_fadvise(fileno, 0, 0, POSIX_FADV_SEQUENTIAL)
+
+        # Hash large files straight from the page cache, without copying
+        # each block into a Python buffer first
+        hasher = None
+        if fstat(fileno).st_size >= MMAP_THRESHOLD:
+            try:
+                with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as mapped:
+                    if hasattr(mmap, "MADV_SEQUENTIAL"):
+                        mapped.madvise(mmap.MADV_SEQUENTIAL)
+                    hasher = new_hash()
+                    hasher.update(mapped)
+            except OSError:
+                # Some filesystems, such as network shares, cannot be mapped
+                hasher = None
+
+        if hasher is None:
+            hasher = hashlib.file_digest(file_obj, new_hash)
+
+        # The contents are not read again, so release their page cache
+        # instead of evicting pages other processes are using
+        if release and posix_fadvise is not None:
+            posix_fadvise(fileno, 0, 0, POSIX_FADV_DONTNEED)
+    return hasher.digest()
+
+
+def sha256_file(filepath: str) -> bytes:
+    """Returns a SHA256 hash of a file.
+
+    Args:
+        filepath (str): Path to file.
+
+    Returns:
+        bytes: SHA256 digest of file.
+    """
+    return stream_file(filepath, new_sha256)
+
+
+def xxh3_file(filepath: str, release: bool = True) -> bytes:
+    """Returns a 128-bit XXH3 hash of a file.
+
+    XXH3 is not cryptographic, but far cheaper per byte than SHA256.
+
+    Args:
+        filepath (str): Path to file.
+        release (bool, optional): Drop the file from the page cache after hashing. Defaults to True.
+
+    Returns:
+        bytes: XXH3-128 digest of file.
+    """
+    return stream_file(filepath, xxhash.xxh3_128, release)
+
+
+def blake3_file(filepath: str) -> bytes:
+    """Returns a BLAKE3 hash of a file.
+
+    Args:
+        filepath (str): Path to file.
+
+    Returns:
+        bytes: BLAKE3 digest of file.
+    """
+    with open(filepath, "rb", buffering=0) as file_obj:
+        fileno = file_obj.fileno()
+
+        # Large files also split their tree hashing across BLAKE3's shared
+        # thread pool, so a few big files at the end of a scan use every core
+        if fstat(fileno).st_size >= BLAKE3_THREADS_THRESHOLD:
+            hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+        else:
+            hasher = blake3.blake3()
+
+        # Memory-mapped, SIMD tree hashing of the whole file in one call
+        digest = hasher.update_mmap(filepath).digest()
+
+        # As in stream_file, release the page cache of contents not read again
+        if posix_fadvise is not None:
+            posix_fadvise(fileno, 0, 0, POSIX_FADV_DONTNEED)
+    return digest
+
+
+def sampled_file(filepath: str, algorithm: str = "sha256") -> bytes:
+    """Returns a hash of a file's size and SAMPLE_SIZE blocks from its start, middle and end.
+
+    Files up to three blocks long are hashed in full, so the fingerprint is only
+    approximate for larger files.
+
+    Args:
+        filepath (str): Path to file.
+        algorithm (str, optional): Hash algorithm, one of HASH_ALGORITHMS. Defaults to "sha256".
+
+    Returns:
+        bytes: Digest of the sampled file contents.
+    """
+    hasher = new_hasher(algorithm)
+    # Unbuffered, the samples are read once and need no extra copy
+    with open(filepath, "rb", buffering=0) as file_obj:
+        size = fstat(file_obj.fileno()).st_size
+        hasher.update(size.to_bytes(8, "little"))
+        if size <= 3 * SAMPLE_SIZE:
+            hasher.update(file_obj.read())
+        else:
+            for offset in (0, size // 2, size - SAMPLE_SIZE):
+                file_obj.seek(offset)
+                hasher.update(file_obj.read(SAMPLE_SIZE))
+    return hasher.digest()
+
+
+# File hash function per supported algorithm
+FILE_HASHERS = {"sha256": sha256_file, "blake3": blake3_file, "xxh3": xxh3_file}
+HASH_ALGORITHMS = tuple(FILE_HASHERS)
+
+# Only content equality matters, so prefer the faster BLAKE3 when it is installed
+DEFAULT_ALGORITHM = "blake3" if blake3 is not None else "sha256"
+
 
 class UnsupportedExtensionError(Exception):
     """Exception raised when an unsupported file extension is encountered."""
@@ -35,64 +235,245 @@ class UnsupportedExtensionError(Exception):
 class DupFinder:
     """Scans directory tree and returns duplicate entries."""
 
-    def __init__(self: "DupFinder") -> None:
-        """Initialize class instance variables."""
-        self.filesobj = {}
-        self.matches = {}
-        self.unique = []
+    def __init__(
+        self: "DupFinder",
+        algorithm: str = DEFAULT_ALGORITHM,
+        *,
+        cache: bool = True,
+        fast: bool = False,
+        processes: bool = False,
+        jobs: int | None = None,
+    ) -> None:
+        """Initialize class instance variables.
+
+        Args:
+            algorithm (str, optional): Hash algorithm, one of HASH_ALGORITHMS.
+                Defaults to "blake3" if installed, otherwise "sha256".
+            cache (bool, optional): Reuse digests of unchanged files from previous runs. Defaults to True.
+            fast (bool, optional): Hash sampled blocks instead of whole files. Defaults to False.
+            processes (bool, optional): Hash on worker processes instead of threads. Defaults to False.
+            jobs (int | None, optional): Number of files read at once. Defaults to the CPU count.
+        """
+        self.algorithm = algorithm
+        self.fast = fast
+        # Resolve the hash function once rather than branching on every file
+        if fast:
+            self.file_hash = partial(sampled_file, algorithm=algorithm)
+            self.digest_type = f"{algorithm}-sampled"
+        else:
+            self.file_hash = FILE_HASHERS[algorithm]
+            self.digest_type = algorithm
+        # XXH3 is not collision resistant, so its matches are compared byte by byte
+        self.confirm = algorithm == "xxh3" and not fast
+        if self.confirm:
+            # Keep the pages cached for that comparison, which releases them
+            self.file_hash = partial(xxh3_file, release=False)
+        self.cache_file = root.joinpath(".dupfinder_cache.sqlite") if cache else None
+        self.processes = processes
+        self.jobs = jobs or cpu_count() or 1
+        self.matches = defaultdict(list)
+        # Extra groups per digest when byte comparison splits a hash match
+        self.collisions = {}
+        self.content_digests = {}
+        self.unique_count = 0
+        self.duplicate_count = 0
         self.mismatch = []
         self.dump_file = root.joinpath("results/duplicate_matches.csv")
 
+        self.processing = f"{Fore.CYAN}\u2BA9{Fore.RESET}"
         self.found = f"{Fore.GREEN}\u2714{Fore.RESET}"
         self.invalid = f"{Fore.RED}\u2716{Fore.RESET}"
         self.separator = f'{Fore.LIGHTBLUE_EX}{"-" * 70}{Fore.RESET}'
 
-    def file_hash(self: "DupFinder", filepath: str, blocksize: int = 65536) -> str:
-        """Returns a SHA256 hash of a file.
+    def contents_hash(self: "DupFinder", data: bytes) -> bytes:
+        """Returns the hash file_hash would give a file holding the given bytes.
+
+        Only valid for files no larger than 3 * SAMPLE_SIZE, which --fast hashes whole.
+
+        Args:
+            data (bytes): Complete contents of a file.
+
+        Returns:
+            bytes: Digest of the contents.
+        """
+        hasher = new_hasher(self.algorithm)
+        if self.fast:
+            hasher.update(len(data).to_bytes(8, "little"))
+        hasher.update(data)
+        return hasher.digest()
+
+    def head_tail_hash(self: "DupFinder", filepath: str) -> bytes:
+        """Returns a SHA256 hash of the first and last HEAD_SIZE bytes of a file.
 
         Args:
             filepath (str): Path to file.
-            blocksize (int, optional): Block size to read. Defaults to 65536.
 
         Returns:
-            str: SHA256 hash of file.
+            bytes: SHA256 digest of the file head and tail.
         """
-        hasher = hashlib.sha256()
         with open(filepath, "rb") as file_obj:
-            for chunk in iter(partial(file_obj.read, blocksize), b""):
-                hasher.update(chunk)
-        return hasher.hexdigest()
+            hasher = new_sha256()
+            hasher.update(file_obj.read(HEAD_SIZE))
+            file_obj.seek(-HEAD_SIZE, SEEK_END)
+            hasher.update(file_obj.read(HEAD_SIZE))
+        return hasher.digest()
 
-    def scantree(self: "DupFinder", basepath: str) -> Iterable[str]:
-        """Recursively scans a directory tree.
+    def candidate_files(self: "DupFinder", entries: list[DirEntry]) -> list[DirEntry]:
+        """Filters out files that cannot have a duplicate.
+
+        Files are grouped by size, then files larger than HEAD_SIZE by a hash of
+        their first and last HEAD_SIZE bytes. Only files sharing both with at
+        least one other file need a full hash.
+
+        Files of the same type tend to share a header, so the tail catches
+        differences the head alone would miss.
+
+        Args:
+            entries (list[DirEntry]): Directory entries of the files.
+
+        Returns:
+            list[DirEntry]: Entries of files that may have a duplicate, largest first.
+        """
+        # DirEntry caches its stat result, so sizes cost no extra syscalls here
+        by_size = defaultdict(list)
+        for entry in entries:
+            by_size[entry.stat().st_size].append(entry)
+
+        # A head hash of a file no larger than HEAD_SIZE covers the whole file,
+        # so those groups skip the pre-filter rather than being read twice
+        groups = [(size, group) for size, group in by_size.items() if len(group) > 1 and size <= HEAD_SIZE]
+        same_size = [
+            (size, entry)
+            for size, group in by_size.items()
+            if len(group) > 1 and size > HEAD_SIZE
+            for entry in group
+        ]
+
+        # Head and tail reads are small and latency-bound, so overlap them on a thread pool
+        by_edges = defaultdict(list)
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            edges = executor.map(self.head_tail_hash, [entry.path for _, entry in same_size])
+            for (size, entry), edge in zip(same_size, edges):
+                by_edges[size, edge].append(entry)
+        groups.extend((size, group) for (size, _), group in by_edges.items() if len(group) > 1)
+
+        # Largest groups first, so the pool never ends up hashing one big file alone
+        groups.sort(key=itemgetter(0), reverse=True)
+        return [entry for _, group in groups for entry in group]
+
+    def scan_directory(self: "DupFinder", dirpath: str, suffix: str = "") -> tuple[list[DirEntry], list[str]]:
+        """Lists the entries of a single directory.
+
+        Hidden directories are treated as files, so they are not descended into.
+
+        Args:
+            dirpath (str): Directory path.
+            suffix (str, optional): Only return files whose name ends with this, in any case.
+                Expected in lowercase. Defaults to "".
+
+        Returns:
+            tuple[list[DirEntry], list[str]]: File entries and subdirectory paths.
+        """
+        files, subdirs = [], []
+        with scandir(dirpath) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.startswith(".") and entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                # Extensions are matched case-insensitively, as on Windows, but
+                # only names that miss the exact lowercase suffix are lowercased
+                elif name.endswith(suffix) or name.lower().endswith(suffix):
+                    files.append(entry)
+        return files, subdirs
+
+    def scantree(self: "DupFinder", basepath: str, suffix: str = "") -> Iterable[DirEntry]:
+        """Scans a directory tree, listing subdirectories concurrently.
+
+        Directory reads block on the filesystem, so subdirectories are listed on
+        a thread pool and their files are yielded as each listing completes.
+        Entries are yielded as-is, so callers can use their cached name and
+        file type without building paths.
 
         Args:
             basepath (str): Base directory path.
+            suffix (str, optional): Only yield files whose name ends with this, in any case.
+                Expected in lowercase. Defaults to "".
 
         Yields:
-            Iterable[str]: Generator object containing file paths.
+            Iterable[DirEntry]: Generator object containing file entries.
         """
-        with scandir(basepath) as entries:
-            for entry in entries:
-                try:
-                    if not entry.name.startswith(".") and entry.is_dir(follow_symlinks=False):
-                        yield from self.scantree(entry.path)
-                    else:
-                        yield entry.path
-                except PermissionError:
-                    continue
+        files, subdirs = self.scan_directory(basepath, suffix)
+        yield from files
+
+        # Listing mostly waits on the filesystem, so use more threads than
+        # cores; that matters most on high-latency mounts such as NFS or SMB
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+            pending = {executor.submit(self.scan_directory, subdir, suffix) for subdir in subdirs}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        files, subdirs = future.result()
+                    except PermissionError:
+                        continue
+                    pending.update(executor.submit(self.scan_directory, subdir, suffix) for subdir in subdirs)
+                    yield from files
+
+    def read_entry(self: "DupFinder", entry: DirEntry, size: int) -> tuple[bytes, bytes | None]:
+        """Reads the signature bytes of a file and caches its stat result.
+
+        Runs on the header thread pool, so the stat() that candidate_files needs
+        overlaps with other I/O instead of running serially later. Files no
+        larger than HEAD_SIZE are read whole and hashed here, which saves
+        opening them again later; only their signature bytes are kept.
 
-    def load_known_extensions(self: "DupFinder") -> dict:
-        """Loads known file extensions and their signatures from a JSON file.
+        Args:
+            entry (DirEntry): Directory entry of the file.
+            size (int): Number of signature bytes to read.
 
         Returns:
-            dict: Dictionary mapping file extensions to their signatures.
+            tuple[bytes, bytes | None]: Up to size bytes from the start of the file,
+            and the digest of its contents if it was read whole.
         """
-        with open(root.joinpath("utils/file_signatures.json"), encoding="utf-8") as file_obj:
-            data = json.load(file_obj)
-            return {item["extension"]: item["signature"] for item in data}
+        filesize = entry.stat().st_size
+        if filesize > HEAD_SIZE:
+            return read_header(entry, size), None
 
-    def scan_finder(self: "DupFinder", directory: str, extension: str) -> Iterable[str]:
+        data = read_header(entry, HEAD_SIZE)
+        digest = self.contents_hash(data) if len(data) == filesize else None
+        return data[:size], digest
+
+    def read_entries(
+        self: "DupFinder",
+        entries: list[DirEntry],
+        size: int,
+    ) -> Iterable[tuple[DirEntry, bytes, bytes | None]]:
+        """Reads the signature bytes of files on a thread pool, in order.
+
+        Only READ_AHEAD reads per worker are in flight at once, so each result
+        is freed once consumed instead of being held until the scan ends.
+
+        Args:
+            entries (list[DirEntry]): Directory entries of the files.
+            size (int): Number of signature bytes to read.
+
+        Yields:
+            Iterable[tuple[DirEntry, bytes, bytes | None]]: Entry, signature bytes and
+            digest of each file, as returned by read_entry.
+        """
+        window = self.jobs * READ_AHEAD
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            for entry in entries:
+                pending.append((entry, executor.submit(self.read_entry, entry, size)))
+                if len(pending) >= window:
+                    entry, future = pending.popleft()
+                    yield entry, *future.result()
+            while pending:
+                entry, future = pending.popleft()
+                yield entry, *future.result()
+
+    def scan_finder(self: "DupFinder", directory: str, extension: str) -> Iterable[DirEntry]:
         """Scans a directory tree for files with a given extension.
 
         Args:
@@ -100,36 +481,43 @@ class DupFinder:
             extension (str): File extension to scan for.
 
         Yields:
-            Iterable[str]: Generator object containing file paths.
+            Iterable[DirEntry]: Generator object containing entries of files with a valid signature.
         """
-        processing = f"{Fore.CYAN}\u2BA9{Fore.RESET}"
-
-        known = self.load_known_extensions()
+        # Shares the signature checker's cached index, so the JSON is parsed once
+        known = load_signature_index()
 
         if extension in known:
-            print(f"{processing} Scanning: {directory} for '{extension}' files")
-            print(f"{processing} Getting file count...", sep=" ", end=" ")
+            print(f"{self.processing} Scanning: {directory} for '{extension}' files")
+            print(f"{self.processing} Getting file count...", sep=" ", end=" ")
 
-            files = list(self.scantree(directory))
-            filecounter = len(files)
-            print(f"{filecounter:,} files")
+            from tqdm import tqdm  # deferred so --help and errors skip the import
 
             file_checker = FileSignatureChecker("", extension)
-            for filepath in tqdm(
-                files,
+
+            # Filter on the directory entry name, no Path object per file
+            entries = list(self.scantree(directory, f".{extension.lower()}"))
+            filecounter = len(entries)
+            print(f"{filecounter:,} files")
+
+            # Headers are read ahead on a thread pool and checked in memory
+            for entry, header, digest in tqdm(
+                self.read_entries(entries, file_checker.header_size),
                 total=filecounter,
-                desc=f"{processing} Processing",
+                desc=f"{self.processing} Processing",
                 ncols=90,
                 unit=" files",
+                mininterval=PROGRESS_INTERVAL,
             ):
-                dirpath = Path(filepath)
-                if dirpath.suffix.strip(".") == extension:
-                    file_checker.filepath = filepath
-                    signature_match = file_checker.check_file()
-                    if signature_match:
-                        yield filepath
-                    else:
-                        self.mismatch.append(filepath)
+                filepath = entry.path
+                # Names were already filtered on the extension, so the MIME type
+                # guessed from them would always match
+                signature_match = file_checker.check_file(header, check_mime=False)
+                if signature_match:
+                    if digest is not None:
+                        self.content_digests[filepath] = digest
+                    yield entry
+                else:
+                    self.mismatch.append(filepath)
         else:
             self.dump_extensions(list(known.keys()))
 
@@ -145,16 +533,146 @@ class DupFinder:
         print("\n".join(knownlist))
         raise UnsupportedExtensionError()
 
+    def hash_files(self: "DupFinder", filepaths: list[str]) -> Iterable[tuple[str, bytes]]:
+        """Hashes files in parallel.
+
+        Args:
+            filepaths (list[str]): Paths to files.
+
+        Yields:
+            Iterable[tuple[str, bytes]]: Generator object containing file paths and hashes.
+        """
+        from tqdm import tqdm  # deferred so --help and errors skip the import
+
+        # hashlib and blake3 release the GIL while hashing, so threads overlap
+        # reads and hashing across files. Processes avoid the GIL entirely,
+        # which pays off when per-file Python overhead dominates.
+        executor_class = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+        with executor_class(max_workers=self.jobs) as executor:
+            yield from tqdm(
+                zip(filepaths, executor.map(self.file_hash, filepaths, chunksize=PROCESS_CHUNKSIZE)),
+                total=len(filepaths),
+                desc=f"{self.processing} Hashing",
+                ncols=90,
+                unit=" files",
+                mininterval=PROGRESS_INTERVAL,
+            )
+
     def file_processor(self: "DupFinder", workingdir: str, extension: str) -> None:
-        """Processes files and returns a dictionary of file paths and hashes.
+        """Processes files and groups their paths by hash.
 
         Args:
             self (DupFinder): Instance of DupFinder class.
             workingdir (str): Directory path to scan.
             extension (str): File extension to scan for.
         """
-        for filename in self.scan_finder(workingdir, extension):
-            self.filesobj.update({filename: self.file_hash(filename).upper()})
+        entries = []
+        for entry in self.candidate_files(list(self.scan_finder(workingdir, extension))):
+            digest = self.content_digests.get(entry.path)
+            if digest is None:
+                entries.append(entry)
+            else:
+                self.matches[digest].append(entry.path)
+        # Only needed for the candidates above, so free the rest
+        self.content_digests.clear()
+
+        if self.cache_file is None:
+            for filepath, digest in self.hash_files([entry.path for entry in entries]):
+                self.matches[digest].append(filepath)
+            return
+
+        with DigestCache(self.cache_file) as cache:
+            # Stat results were cached during the scan, before any hashing
+            uncached = {}
+            for entry in entries:
+                file_stat = entry.stat()
+                if not file_stat.st_ino:
+                    # DirEntry leaves st_dev and st_ino zeroed on Windows
+                    file_stat = stat(entry.path)
+                digest = cache.get(file_stat, self.digest_type)
+                if digest is None:
+                    uncached[entry.path] = file_stat
+                else:
+                    self.matches[digest].append(entry.path)
+
+            for filepath, digest in self.hash_files(list(uncached)):
+                cache.set(uncached[filepath], self.digest_type, digest)
+                self.matches[digest].append(filepath)
+
+    @staticmethod
+    def identical_files(files: list[str]) -> list[list[str]]:
+        """Splits files that share a digest into groups of byte-identical files.
+
+        The files are read side by side, a CONFIRM_BLOCK_SIZE block at a time, so
+        each is read once, and a group splits where its blocks first differ.
+
+        Args:
+            files (list[str]): Paths to files with the same digest.
+
+        Returns:
+            list[list[str]]: Groups of at least two files with identical contents.
+        """
+        groups = []
+        with ExitStack() as stack:
+            opened = [(filepath, stack.enter_context(open(filepath, "rb"))) for filepath in files]
+            pending = [opened]
+            while pending:
+                # Only the first block of each distinct split is kept, usually one
+                splits = []
+                for filepath, file_obj in pending.pop():
+                    block = file_obj.read(CONFIRM_BLOCK_SIZE)
+                    for first_block, members in splits:
+                        if block == first_block:
+                            members.append((filepath, file_obj))
+                            break
+                    else:
+                        splits.append((block, [(filepath, file_obj)]))
+
+                for block, members in splits:
+                    if len(members) < 2:
+                        continue
+                    if block:
+                        pending.append(members)
+                    else:
+                        # All reached the end together, so the contents are identical
+                        groups.append([filepath for filepath, _ in members])
+
+            # Hashing kept these pages cached for this pass; they are not read again
+            if posix_fadvise is not None:
+                for _, file_obj in opened:
+                    posix_fadvise(file_obj.fileno(), 0, 0, POSIX_FADV_DONTNEED)
+        return groups
+
+    def confirm_matches(self: "DupFinder") -> None:
+        """Confirms hash matches by comparing file contents.
+
+        Args:
+            self (DupFinder): Instance of DupFinder class.
+        """
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            splits = executor.map(self.identical_files, list(self.matches.values()))
+            for filehash, groups in zip(list(self.matches), splits):
+                if not groups:
+                    del self.matches[filehash]
+                    continue
+                self.matches[filehash] = groups[0]
+                # A hash collision, the other sets of identical files share the digest
+                if len(groups) > 1:
+                    self.collisions[filehash] = groups[1:]
+
+    def duplicate_groups(self: "DupFinder") -> Iterable[tuple[bytes, list[str]]]:
+        """Yields each group of duplicate files with its digest.
+
+        Sets of files split from one digest by confirm_matches each come as their
+        own group, with that same digest.
+
+        Yields:
+            Iterable[tuple[bytes, list[str]]]: Generator object containing digests and file paths.
+        """
+        for filehash, files in self.matches.items():
+            yield filehash, files
+            for group in self.collisions.get(filehash, ()):
+                yield filehash, group
 
     def find_duplicates(self: "DupFinder") -> None:
         """Finds duplicate files and saves to file.
@@ -162,20 +680,29 @@ class DupFinder:
         Args:
             self (DupFinder): Instance of DupFinder class.
         """
-        for files, hashes in self.filesobj.items():
-            self.matches.setdefault(hashes, []).append(files)
+        # Keep only groups with duplicates, so memory is bounded by the duplicates found
+        for filehash in [filehash for filehash, files in self.matches.items() if len(files) < 2]:
+            del self.matches[filehash]
 
-        with open(self.dump_file, "w", newline="", encoding="utf-8") as csvfile:
-            fieldnames = ["File", "Hash"]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
+        # XXH3 is not collision resistant, so check its matches byte by byte
+        if self.confirm:
+            self.confirm_matches()
 
-            for filehash, files in self.matches.items():
-                if len(files) > 1:  # if file has more than 1 hash
-                    for file in files:
-                        if filehash:
-                            writer.writerow({"File": file, "Hash": filehash})
-                            self.unique.append(filehash)
+        # Groups already hold distinct contents, so count them instead of building a set
+        self.unique_count = self.duplicate_count = 0
+        for _, files in self.duplicate_groups():
+            self.unique_count += 1
+            self.duplicate_count += len(files)
+
+        self.dump_file.parent.mkdir(exist_ok=True)
+        with open(self.dump_file, "w", newline="", encoding="utf-8") as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(("File", "Hash"))
+            writer.writerows(
+                (filepath, filehash.hex().upper())
+                for filehash, files in self.duplicate_groups()
+                for filepath in files
+            )
 
     def dump_duplicates(self: "DupFinder") -> None:
         """Prints duplicate files to console and saves to file.
@@ -183,26 +710,32 @@ class DupFinder:
         Args:
             self (DupFinder): Instance of DupFinder class.
         """
+        # Deferred so runs without duplicates skip the import
+        from rich.console import Console
+        from rich.table import Table
+
         # Create a new table object and set the title
         table = Table(title="Duplicates")
 
-        # Read the CSV file
-        with open(self.dump_file) as csvfile:
-            csv_reader = csv.reader(csvfile)
-            header = next(csv_reader)  # Read the header row
-            table.add_column(header[0], style="cyan", no_wrap=True)  # Add the first column as a header
-            table.add_column(header[1], style="magenta")  # Add the second column as a header
+        table.add_column("File", style="cyan", no_wrap=True)
+        table.add_column("Hash", style="magenta")
 
-            for row in csv_reader:
-                table.add_row(*row)
+        # Fill the table from the grouped results instead of re-reading the CSV.
+        # Rich renders a table all at once, so large results are cut short;
+        # the full list is in the CSV file.
+        rows = ((filepath, filehash) for filehash, files in self.duplicate_groups() for filepath in files)
+        for filepath, filehash in islice(rows, TABLE_ROW_LIMIT):
+            table.add_row(filepath, filehash.hex().upper())
 
         console = Console()
         console.print(table)
+        if self.duplicate_count > TABLE_ROW_LIMIT:
+            print(f"{self.found} Showing {TABLE_ROW_LIMIT:,} of {self.duplicate_count:,} duplicate files")
 
     def duplicate_results(self: "DupFinder", ext: str) -> None:
         """Prints duplicate and mismatch files to console."""
         self.dump_duplicates()  # dump duplicates to console
-        print(f"{self.found} Unique file hashes: {len(set(self.unique))} of {len(self.unique)}")
+        print(f"{self.found} Unique file hashes: {self.unique_count} of {self.duplicate_count}")
         print(f"{self.found} Duplicate matches written to: {self.dump_file.resolve(strict=True)}")
         if self.mismatch:
             print(f"\nUnable to validate the file signature for the following '{ext}' files:\n{self.separator}")
@@ -210,23 +743,62 @@ class DupFinder:
                 print(f"  [{num}] {filename}")
 
 
-def parse_arguments() -> tuple[str, str]:
+def parse_arguments() -> argparse.Namespace:
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(description="Duplicate File Finder")
     parser.add_argument("dirpath", help="directory path to scan")
     parser.add_argument("ext", help="file extension")
+    parser.add_argument(
+        "--hash",
+        dest="algorithm",
+        choices=HASH_ALGORITHMS,
+        default=DEFAULT_ALGORITHM,
+        help="hash algorithm (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        help="rehash every file instead of reusing digests from previous runs",
+    )
+    parser.add_argument(
+        "--processes",
+        action="store_true",
+        help="hash on worker processes instead of threads",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="number of files read at once, lower it for spinning disks (default: CPU count)",
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="hash only the start, middle and end of large files (approximate)",
+    )
     args = parser.parse_args()
 
-    dirpath = args.dirpath
-    ext = args.ext
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.algorithm == "blake3" and blake3 is None:
+        parser.error("blake3 is not installed, run: pip install blake3")
+    if args.algorithm == "xxh3" and xxhash is None:
+        parser.error("xxhash is not installed, run: pip install xxhash")
 
-    return dirpath, ext
+    return args
 
 
 def main() -> None:
     """Main function."""
-    dirpath, ext = parse_arguments()
-    dup_finder = DupFinder()
+    args = parse_arguments()
+    dirpath, ext = args.dirpath, args.ext
+    dup_finder = DupFinder(
+        args.algorithm,
+        cache=args.cache,
+        fast=args.fast,
+        processes=args.processes,
+        jobs=args.jobs,
+    )
 
     try:
         dup_finder.file_processor(dirpath, ext)
@@ -238,13 +810,14 @@ def main() -> None:
         sys.exit(1)
 
     # print results if unique duplicates found
-    if dup_finder.unique:
+    if dup_finder.duplicate_count:
         dup_finder.duplicate_results(ext)
     else:
         print("\nNo duplicates found.")
 
 
-if __name__ == "__main__":
+def print_banner() -> None:
+    """Prints the program banner."""
     banner = rf"""{Fore.CYAN}
         ____              _______ __        _______           __
        / __ \__  ______  / ____(_) /__     / ____(_)___  ____/ /__  _____
@@ -253,9 +826,12 @@ if __name__ == "__main__":
     /_____/\__,_/ .___/_/   /_/_/\___/  /_/   /_/_/ /_/\__,_/\___/_/
                /_/
     {Fore.RESET}"""
-
     print(banner)
 
+
+if __name__ == "__main__":
+    print_banner()
+
     # check python version
     if sys.version_info < (3, 8):  # noqa: UP036
         print("Python 3.8 or higher is required.")
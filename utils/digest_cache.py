@@ -0,0 +1,73 @@
+"""Persistent cache of file digests, keyed by device and inode."""
+
+import sqlite3
+from os import stat_result
+from pathlib import Path
+from typing import Self
+
+
+class DigestCache:
+    """File digest cache class."""
+
+    def __init__(self: "DigestCache", cache_file: Path) -> None:
+        """Initialize class instance variables."""
+        self.connection = sqlite3.connect(cache_file)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS digests (
+                device INTEGER,
+                inode INTEGER,
+                algorithm TEXT,
+                mtime_ns INTEGER,
+                size INTEGER,
+                digest BLOB,
+                PRIMARY KEY (device, inode, algorithm)
+            )
+            """,
+        )
+
+    def __enter__(self: Self) -> Self:
+        """Return the cache for use as a context manager."""
+        return self
+
+    def __exit__(self: "DigestCache", *exc_info: object) -> None:
+        """Commit pending writes and close the database."""
+        self.close()
+
+    def get(self: "DigestCache", file_stat: stat_result, algorithm: str) -> bytes | None:
+        """Gets the cached digest of a file.
+
+        Args:
+            file_stat (stat_result): Result of stat() on the file.
+            algorithm (str): Hash algorithm the digest was computed with.
+
+        Returns:
+            bytes | None: Cached digest, or None if missing or the file has changed since.
+        """
+        row = self.connection.execute(
+            "SELECT mtime_ns, size, digest FROM digests WHERE device = ? AND inode = ? AND algorithm = ?",
+            (file_stat.st_dev, file_stat.st_ino, algorithm),
+        ).fetchone()
+        if row is None or row[:2] != (file_stat.st_mtime_ns, file_stat.st_size):
+            return None
+        return row[2]
+
+    def set(self: "DigestCache", file_stat: stat_result, algorithm: str, digest: bytes) -> None:
+        """Stores the digest of a file.
+
+        Writes are committed together when the cache is closed.
+
+        Args:
+            file_stat (stat_result): Result of stat() on the file, taken before hashing.
+            algorithm (str): Hash algorithm the digest was computed with.
+            digest (bytes): Digest of the file.
+        """
+        self.connection.execute(
+            "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?)",
+            (file_stat.st_dev, file_stat.st_ino, algorithm, file_stat.st_mtime_ns, file_stat.st_size, digest),
+        )
+
+    def close(self: "DigestCache") -> None:
+        """Commits pending writes and closes the database."""
+        self.connection.commit()
+        self.connection.close()
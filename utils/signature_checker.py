@@ -2,8 +2,53 @@
 
 import json
 import mimetypes
+import os
+from functools import cache
 from pathlib import Path
 
+# Raw descriptor reads skip the Python file object; O_BINARY only exists on Windows
+READ_FLAGS = os.O_RDONLY | getattr(os, "O_BINARY", 0)
+
+# Bytes read from the start of a file, enough to cover every known signature
+HEADER_SIZE = 128
+
+
+def read_header(filepath: str | os.PathLike, size: int = HEADER_SIZE) -> bytes:
+    """Reads the first bytes of a file.
+
+    Args:
+        filepath (str | os.PathLike): Path to the file to read, or an os.DirEntry.
+        size (int, optional): Number of bytes to read. Defaults to HEADER_SIZE.
+
+    Returns:
+        bytes: Up to size bytes from the start of the file.
+    """
+    fd = os.open(filepath, READ_FLAGS)
+    try:
+        return os.read(fd, size)
+    finally:
+        os.close(fd)
+
+
+@cache
+def load_signature_index() -> dict:
+    """Loads the file signatures, indexed by extension.
+
+    The file is read and its hex signatures converted once per process;
+    later calls return the cached result.
+
+    Returns:
+        dict: Dictionary mapping file extensions to a tuple of their signatures and offset.
+    """
+    with open(Path(__file__).parent.joinpath("file_signatures.json"), encoding="utf-8") as json_file:
+        return {
+            item["extension"]: (
+                tuple(bytes.fromhex(sig.replace(" ", "")) for sig in item["signature"]),
+                item.get("offset", 0),
+            )
+            for item in json.load(json_file)
+        }
+
 
 class FileSignatureChecker:
     """File signature checker class."""
@@ -12,67 +57,56 @@ class FileSignatureChecker:
         """Initialize class instance variables."""
         self.filepath = filepath
         self.extension = extension
-        self.file_sigs = self.load_file_signatures()
         self.expected_signature, self.expected_offset = self.get_expected_signature()
-        self.expected_mime = None
-
-    def load_file_signatures(self: "FileSignatureChecker") -> dict:
-        """Loads the file signatures."""
-        file_sigs_path = Path(__file__).resolve().parent.joinpath("file_signatures.json")
-        with open(file_sigs_path, encoding="utf-8") as json_file:
-            return json.load(json_file)
-
-    def read_file_signature(self: "FileSignatureChecker", filepath: str, expected_sig: bytes, offset: int) -> bool:
-        """Reads the file signature at a given offset.
+        # MIME type registered for the extension, looked up once per checker;
+        # None when mimetypes has no type for it, and then nothing to compare
+        self.expected_mime = mimetypes.guess_type(f"file.{extension.lower()}")[0]
+        # Bytes a header must cover to hold the longest expected signature
+        self.header_size = (self.expected_offset or 0) + max(map(len, self.expected_signature), default=0)
 
-        Args:
-            filepath (str): Path to the file to read.
-            expected_sig (bytes): Expected file signature.
-            offset (int): Offset to read the file signature from.
+    def check_file_signature(self: "FileSignatureChecker") -> bool | None:
+        """Checks the file signature against a list of expected values.
 
         Returns:
-            bool: True if the file signature matches the expected value, False otherwise.
+            bool: True if the file signature matches any of the expected values, False otherwise.
         """
-        with open(filepath, "rb") as file:
-            file.seek(offset)
-            signature = file.read(len(expected_sig))
+        if not self.expected_signature or self.expected_offset is None:
+            return False
+        # One read covers the longest signature, instead of one open per signature
+        return self.check_header(read_header(self.filepath, self.header_size))
 
-        # Compare the signature with the expected value
-        return signature == expected_sig
+    def check_header(self: "FileSignatureChecker", header: bytes) -> bool:
+        """Checks a file header that has already been read against the expected values.
 
-    def check_file_signature(self: "FileSignatureChecker") -> bool | None:
-        """Checks the file signature against a list of expected values.
+        Args:
+            header (bytes): Bytes from the start of the file.
 
         Returns:
-            bool: True if the file signature matches any of the expected values, False otherwise.
+            bool: True if the header matches any of the expected values, False otherwise.
         """
         if not self.expected_signature or self.expected_offset is None:
             return False
-        return any(self.read_file_signature(self.filepath, sig, self.expected_offset) for sig in self.expected_signature)
+        return any(header.startswith(sig, self.expected_offset) for sig in self.expected_signature)
 
     def get_expected_signature(self: "FileSignatureChecker") -> tuple:
         """Gets the expected file signature and offset for a given file extension.
 
         Returns:
-            tuple | None: Tuple containing the expected file signature and offset,
-            or None if the file extension is not recognized.
+            tuple: Tuple containing the expected file signatures and offset, or no
+            signatures and a None offset if the file extension is not recognized.
         """
-        for item in self.file_sigs:
-            if item["extension"] == self.extension:
-                signatures = [bytes.fromhex(sig.replace(" ", "")) for sig in item["signature"]]
-                offset = item.get("offset", 0)
-                return signatures, offset
-        return [], None
+        return load_signature_index().get(self.extension, ((), None))
 
     def check_mime_type(self: "FileSignatureChecker") -> bool:
-        """Checks the MIME type of a file against a list of expected values.
+        """Checks the MIME type of a file against the one registered for the extension.
 
         Returns:
-            bool: True if MIME type matches any of the expected values, False otherwise.
+            bool: True if the MIME types match, False otherwise.
         """
         if self.expected_mime is None:
-            self.expected_mime = mimetypes.guess_type(self.filepath)[0]
-        return self.expected_mime == mimetypes.guess_type(self.filepath)[0]
+            return True
+        # Lowercased, as encoding suffixes such as .GZ are matched case-sensitively
+        return mimetypes.guess_type(self.filepath.lower())[0] == self.expected_mime
 
     def check_file_extension(self: "FileSignatureChecker") -> bool:
         """Checks the file extension of a file against a list of expected values.
@@ -82,12 +116,24 @@ class FileSignatureChecker:
         """
         return bool(self.expected_signature and self.expected_offset is not None)
 
-    def check_file(self: "FileSignatureChecker") -> bool | str:
+    def check_file(
+        self: "FileSignatureChecker",
+        header: bytes | None = None,
+        check_mime: bool = True,
+    ) -> bool | str:
         """Checks the file signature, MIME type, and file extension of a file.
 
+        Args:
+            header (bytes | None, optional): Bytes from the start of the file, if already read.
+                When None, the signature is read from the file. Defaults to None.
+            check_mime (bool, optional): Check the MIME type guessed from the file name. Callers
+                that already filtered names by extension can skip it, as it cannot fail then.
+                Defaults to True.
+
         Returns:
             str: Results of the file signature, MIME type, and file extension checks.
         """
         if not self.check_file_extension():
             return False
-        return bool(self.check_file_signature() and self.check_mime_type())
+        signature_match = self.check_file_signature() if header is None else self.check_header(header)
+        return bool(signature_match and (not check_mime or self.check_mime_type()))